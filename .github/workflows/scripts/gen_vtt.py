@@ -43,8 +43,25 @@ from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:  # optional speedup; stdlib json parses the same documents
+    json_loads = json.loads
+
 # --------------------------- Utilities -------------------------------------
 
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+CC_LINE_RE = re.compile(
+    r"^(?P<clock>\d{2}:\d{2}:\d{2})"
+    r"\s*\|\s*"
+    r"(?P<name>.+?)"
+    r"(?:\s*\(\s*@(?P<handle>[A-Za-z0-9_]+)\s*\))?"
+    r"\s*:\s*(?P<text>.*)$"
+)
+
 
 def eprint(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
@@ -82,6 +99,14 @@ def parse_program_datetime(s: str) -> Optional[datetime]:
     """Parse programDateTime-style strings from the CC JSONL, return UTC."""
     if not s:
         return None
+    # fromisoformat is C-implemented and (3.11+) takes "+0000" offsets;
+    # strptime stays as the fallback for anything it rejects.
+    try:
+        dt = datetime.fromisoformat(s)
+    except ValueError:
+        dt = None
+    if dt is not None and dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc)
     for fmt in ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z"):
         try:
             dt = datetime.strptime(s, fmt)
@@ -95,7 +120,7 @@ def tokenize(text: str) -> List[str]:
     """Simple tokenizer for similarity."""
     text = text.lower()
     # Replace non-alphanumeric with spaces
-    text = re.sub(r"[^a-z0-9]+", " ", text)
+    text = NON_ALNUM_RE.sub(" ", text)
     toks = [t for t in text.split() if len(t) >= 3]
     return toks
 
@@ -150,8 +175,8 @@ def load_deepgram(path: str) -> List[DGUtterance]:
         eprint("[gen_vtt] No Deepgram JSON found, falling back to CC-only.")
         return []
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            dg = json.load(f)
+        with open(path, "rb") as f:
+            dg = json_loads(f.read())
     except Exception as e:
         eprint(f"[gen_vtt] Failed to parse Deepgram JSON: {e}")
         return []
@@ -207,18 +232,10 @@ def load_cc_txt(path: Optional[str]) -> Tuple[Dict[str, str], Dict[str, str]]:
         eprint("[gen_vtt] No CC.txt found for speaker mapping.")
         return dict(handle_text), handle_name
 
-    pattern = re.compile(
-        r"^(?P<clock>\d{2}:\d{2}:\d{2})"
-        r"\s*\|\s*"
-        r"(?P<name>.+?)"
-        r"(?:\s*\(\s*@(?P<handle>[A-Za-z0-9_]+)\s*\))?"
-        r"\s*:\s*(?P<text>.*)$"
-    )
-
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.rstrip("\n")
-            m = pattern.match(line)
+            m = CC_LINE_RE.match(line)
             if not m:
                 continue
             handle = m.group("handle")
@@ -260,11 +277,13 @@ def map_speakers(
     if not speaker_ids or not handle_text:
         return {sid: SpeakerInfo(speaker_id=sid) for sid in speaker_ids}
 
-    # Build DG corpora per speaker
+    # Build DG corpora per speaker (one pass over the utterances)
+    dg_texts: Dict[str, List[str]] = defaultdict(list)
+    for u in dg_utts:
+        dg_texts[u.speaker_id].append(u.text)
     dg_corpora: Dict[str, Counter] = {}
     for sid in speaker_ids:
-        all_txt = " ".join(u.text for u in dg_utts if u.speaker_id == sid)
-        toks = tokenize(all_txt)
+        toks = tokenize(" ".join(dg_texts[sid]))
         dg_corpora[sid] = build_corpus(toks)
 
     # Build handle corpora
@@ -506,13 +525,13 @@ def estimate_absolute_start(cc_jsonl: str, shift_secs: float) -> Optional[str]:
                 if "programDateTime" not in line:
                     continue
                 try:
-                    obj = json.loads(line)
+                    obj = json_loads(line)
                 except Exception:
                     continue
                 pl = obj.get("payload")
                 if isinstance(pl, str):
                     try:
-                        plj = json.loads(pl)
+                        plj = json_loads(pl)
                     except Exception:
                         plj = None
                 else:
@@ -523,7 +542,7 @@ def estimate_absolute_start(cc_jsonl: str, shift_secs: float) -> Optional[str]:
                 body = plj.get("body")
                 if isinstance(body, str):
                     try:
-                        inner = json.loads(body)
+                        inner = json_loads(body)
                     except Exception:
                         inner = None
                 else:
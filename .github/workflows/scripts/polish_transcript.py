@@ -21,21 +21,28 @@ FILLER_PHRASES = [r"you\s+know", r"i\s+mean", r"kind\s+of", r"sort\s+of", r"you\
 FILLERS_RE = re.compile(r"\b(?:" + "|".join(FILLER_WORDS + FILLER_PHRASES) + r")\b", re.I)
 STUTTER_RE = re.compile(r"\b([A-Za-z])(?:\s+\1\b){1,5}")
 REPEAT_RE  = re.compile(r"\b([A-Za-z]{2,})\b(?:\s+\1\b){1,4}", re.I)
+LONE_I_RE  = re.compile(r"\bi\b")
+SENT_START_RE = re.compile(r"(^|\.\s+|\?\s+|!\s+)([a-z])")
+WORD_RE    = re.compile(r"\b\w+\b")
+MULTI_WS_RE = re.compile(r"\s{2,}")
+SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([,.;:!?])")
+NO_SPACE_AFTER_PUNCT_RE = re.compile(r"([,;:])([^\s])")
+BLANK_LINES_RE = re.compile(r"\n{3,}")
 
 def sentence_case(s: str) -> str:
-    s = re.sub(r"\bi\b", "I", s)
+    s = LONE_I_RE.sub("I", s)
     def cap_first(m):
         pre = m.group(1) or ""
         ch  = m.group(2).upper()
         return pre + ch
-    return re.sub(r"(^|\.\s+|\?\s+|!\s+)([a-z])", cap_first, s)
+    return SENT_START_RE.sub(cap_first, s)
 
 def ensure_end_punct(s: str) -> str:
     t = s.rstrip()
     if not t: return s
     if t[-1] in ".!?\":)””’'»]>": return s
     if URL_RE.search(t[-80:]): return s
-    if len(re.findall(r"\b\w+\b", t)) >= 6:
+    if len(WORD_RE.findall(t)) >= 6:
         return t + "."
     return s
 
@@ -44,10 +51,10 @@ def apply_rules(txt: str) -> str:
     txt = FILLERS_RE.sub("", txt)
     txt = STUTTER_RE.sub(lambda m: m.group(1), txt)
     txt = REPEAT_RE.sub(lambda m: m.group(1), txt)
-    txt = re.sub(r"\s{2,}", " ", txt).strip()
-    txt = re.sub(r"\bi\b", "I", txt)
-    txt = re.sub(r"\s+([,.;:!?])", r"\1", txt)
-    txt = re.sub(r"([,;:])([^\s])", r"\1 \2", txt)
+    txt = MULTI_WS_RE.sub(" ", txt).strip()
+    txt = LONE_I_RE.sub("I", txt)
+    txt = SPACE_BEFORE_PUNCT_RE.sub(r"\1", txt)
+    txt = NO_SPACE_AFTER_PUNCT_RE.sub(r"\1 \2", txt)
     txt = sentence_case(txt)
     txt = ensure_end_punct(txt)
     txt = txt.replace("<","&lt;").replace(">","&gt;")
@@ -70,6 +77,6 @@ def _replace(m):
     return f"{open_tag}{new_text}{close_tag}"
 
 polished_html = TEXT_NODE.sub(_replace, raw_html)
-polished_html = re.sub(r"\n{3,}", "\n\n", polished_html)
+polished_html = BLANK_LINES_RE.sub("\n\n", polished_html)
 with open(OUT, "w", encoding="utf-8") as f:
     f.write(polished_html)
@@ -1,10 +1,19 @@
 # file: .github/workflows/scripts/replies_web.py
 #!/usr/bin/env python3
-import os, re, json, html, time, traceback
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+import os, io, re, gzip, json, html, time, base64, random, atexit, threading, traceback
+import http.client
+from urllib.parse import urlencode, quote_plus, urljoin, urlsplit, urlunsplit, parse_qsl, unquote
 from urllib.error import HTTPError, URLError
+from urllib.request import getproxies, proxy_bypass
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:  # optional speedup; stdlib json parses the same documents
+    json_loads = json.loads
 
 # --------- ENV & Paths ----------
 ARTDIR = os.environ.get("ARTDIR",".")
@@ -29,15 +38,35 @@ SAVE_JSON   = (os.environ.get("REPLIES_SAVE_JSON","1") or "1") not in ("0","fals
 BASE_X      = "https://x.com"
 BASE_TW     = "https://twitter.com"
 
+# Query keys that only track the click on any host; dropped when deduplicating shared links
+TRACKING_PARAMS = {"utm_source","utm_medium","utm_campaign","utm_content","utm_term",
+                   "ref_src","ref_url","igshid","fbclid","gclid"}
+# Share-sheet keys that are tracking only on these hosts (elsewhere s=/t= can be
+# a search query or a YouTube timestamp, so they stay part of the link)
+SHARE_PARAMS = {"s","t","si"}
+SHARE_HOSTS  = {"x.com","twitter.com","mobile.x.com","mobile.twitter.com","open.spotify.com"}
+
+# Purple pill tweet link -> (screen_name, status id); ids are ASCII digits only
+PURPLE_RE   = re.compile(r"https?://(?:x|twitter)\.com/([^/]+)/status/(\d+)", re.ASCII)
+
 # Primary: the web app’s own conversation timeline endpoint (most reliable)
 CONVO_URL   = f"{BASE_X}/i/api/2/timeline/conversation/{{tid}}.json"
 # Fallback: adaptive search for conversation_id
 SEARCH_URL  = f"{BASE_X}/i/api/2/search/adaptive.json"
 
 # --------- Helpers ----------
+# Log file stays open for the whole run; line buffered so a killed job keeps its log
+_LOG_FH = None
+_LOG_LOCK = threading.Lock()   # the page prefetch thread logs too
+
 def ensure_dirs():
+    global _LOG_FH
+    if _LOG_FH is not None:
+        return
     os.makedirs(ARTDIR, exist_ok=True)
     os.makedirs(DBG_DIR, exist_ok=True)
+    _LOG_FH = open(LOG_PATH, "a", encoding="utf-8", buffering=1)
+    atexit.register(_LOG_FH.close)
 
 def mask_token(s: str, keep=6):
     if not s: return ""
@@ -47,8 +76,8 @@ def mask_token(s: str, keep=6):
 def log(msg: str):
     ensure_dirs()
     ts = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
-    with open(LOG_PATH, "a", encoding="utf-8") as lf:
-        lf.write(f"[{ts}Z] {msg}\n")
+    with _LOG_LOCK:
+        _LOG_FH.write(f"[{ts}Z] {msg}\n")
 
 def write_empty(reason=""):
     ensure_dirs()
@@ -79,6 +108,7 @@ def headers(screen_name, root_id):
         "Cache-Control": "no-cache",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
         "Accept": "application/json, text/plain, */*",
+        "Accept-Encoding": "gzip",
         "Accept-Language": "en-US,en;q=0.9",
         "Referer": f"https://x.com/{screen_name}/status/{root_id}",
         "Origin":  "https://x.com",
@@ -91,18 +121,21 @@ def headers(screen_name, root_id):
     return hdr
 
 def save_debug_blob(kind, idx, raw):
-    if not SAVE_JSON: return
     ensure_dirs()
     path = f"{DBG_PREFIX}_{kind}{idx:02d}.json"
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(raw if isinstance(raw, str) else json.dumps(raw, ensure_ascii=False))
+        if isinstance(raw, bytes):
+            with open(path, "wb") as f:
+                f.write(raw)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(raw if isinstance(raw, str) else json.dumps(raw, ensure_ascii=False))
         log(f"Saved debug {kind} page {idx} to {path}")
     except Exception as e:
         log(f"Failed to save debug {kind} page {idx}: {e}")
 
 def parse_purple(url):
-    m = re.search(r"https?://(?:x|twitter)\.com/([^/]+)/status/(\d+)", url)
+    m = PURPLE_RE.search(url)
     if not m:
         return None, None
     return m.group(1), m.group(2)
@@ -129,13 +162,86 @@ def ensure_inputs():
     return screen_name, str(root_id)
 
 # --------- HTTP fetch with retries ----------
+# Rate limits, the odd guest-token 403, and transient gateway errors
+RETRY_CODES = (429, 403, 502, 503, 504)
+
+# One kept-alive HTTPS connection per host, shared by every page of both collectors
+_CONNS = {}
+
+# Last x-rate-limit-remaining / x-rate-limit-reset seen per host
+_RATE = {}
+
+# Redirect statuses followed like urlopen did, up to a few hops
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS  = 5
+
+def _dial(host, timeout):
+    """New HTTPS connection to host, tunnelled through HTTPS_PROXY unless
+    NO_PROXY exempts the host (the same env urlopen honoured)."""
+    proxy = getproxies().get("https")
+    if not proxy or proxy_bypass(host):
+        return http.client.HTTPSConnection(host, timeout=timeout)
+    p = urlsplit(proxy if "://" in proxy else "http://" + proxy)
+    tunnel_hdrs = {}
+    if p.username:
+        cred = f"{unquote(p.username)}:{unquote(p.password or '')}".encode()
+        tunnel_hdrs["Proxy-Authorization"] = "Basic " + base64.b64encode(cred).decode()
+    conn = http.client.HTTPSConnection(p.hostname, p.port, timeout=timeout)
+    conn.set_tunnel(host, headers=tunnel_hdrs)
+    return conn
+
+def _get_once(url, hdrs, timeout):
+    """One GET over the host's pooled connection -> (response, body bytes)."""
+    parts = urlsplit(url)
+    host = parts.netloc
+    path = parts.path + ("?" + parts.query if parts.query else "")
+    while True:
+        reused = host in _CONNS
+        conn = _CONNS.get(host) or _CONNS.setdefault(host, _dial(host, timeout))
+        try:
+            conn.request("GET", path, headers=hdrs)
+            r = conn.getresponse()
+            return r, r.read()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            _CONNS.pop(host, None)
+            if not reused:
+                raise URLError(e)
+            # server dropped the idle keep-alive socket: redial once
+
+def http_get(url, hdrs, timeout):
+    """GET over pooled keep-alive connections; follows redirects and honours
+    HTTPS_PROXY/NO_PROXY, and raises HTTPError/URLError like urlopen."""
+    for _ in range(MAX_REDIRECTS + 1):
+        r, raw = _get_once(url, hdrs, timeout)
+        loc = r.getheader("Location")
+        if r.status not in REDIRECT_CODES or not loc:
+            break
+        nxt = urljoin(url, loc)
+        if urlsplit(nxt).scheme != "https":
+            break   # only HTTPS is pooled; surface the redirect as an error
+        url = nxt
+    try:
+        _RATE[urlsplit(url).netloc] = (int(r.getheader("x-rate-limit-remaining")),
+                                       int(r.getheader("x-rate-limit-reset")))
+    except (TypeError, ValueError):
+        pass
+    if (r.getheader("Content-Encoding") or "").lower() == "gzip":
+        raw = gzip.decompress(raw)
+    if r.status >= 300:
+        raise HTTPError(url, r.status, r.reason, r.headers, io.BytesIO(raw))
+    return raw
+
 def fetch_json(url, hdrs, tag, attempt=1, backoff=2.0, timeout=30):
     try:
-        req = Request(url, headers=hdrs)
-        with urlopen(req, timeout=timeout) as r:
-            raw = r.read().decode("utf-8", "ignore")
-            data = json.loads(raw) if raw.strip() else {}
-            return data, raw, None
+        raw = http_get(url, hdrs, timeout)
+        if not raw.strip():
+            return {}, raw, None
+        try:
+            data = json_loads(raw)
+        except ValueError:  # stray invalid UTF-8: drop it, as the old str decode did
+            data = json_loads(raw.decode("utf-8", "ignore"))
+        return data, raw, None
     except HTTPError as e:
         body = ""
         try:
@@ -143,8 +249,8 @@ def fetch_json(url, hdrs, tag, attempt=1, backoff=2.0, timeout=30):
         except Exception:
             pass
         log(f"{tag} HTTPError {e.code} url={url} body={body[:800]}")
-        if e.code in (429, 403) and attempt <= 4:
-            sleep_for = backoff ** attempt
+        if e.code in RETRY_CODES and attempt <= 4:
+            sleep_for = backoff ** attempt + random.uniform(0, 0.5)
             log(f"{tag} retry after {sleep_for:.1f}s (attempt {attempt}/4)")
             time.sleep(sleep_for)
             return fetch_json(url, hdrs, tag, attempt+1, backoff, timeout)
@@ -152,7 +258,7 @@ def fetch_json(url, hdrs, tag, attempt=1, backoff=2.0, timeout=30):
     except URLError as e:
         log(f"{tag} URLError {getattr(e,'reason',e)} url={url}")
         if attempt <= 4:
-            sleep_for = backoff ** attempt
+            sleep_for = backoff ** attempt + random.uniform(0, 0.5)
             log(f"{tag} retry after {sleep_for:.1f}s (attempt {attempt}/4)")
             time.sleep(sleep_for)
             return fetch_json(url, hdrs, tag, attempt+1, backoff, timeout)
@@ -161,33 +267,46 @@ def fetch_json(url, hdrs, tag, attempt=1, backoff=2.0, timeout=30):
         log(f"{tag} EXC: {e}\n{traceback.format_exc()}")
         return None, None, e
 
+def page_delay(url):
+    """Pause before the next page: none while the rate-limit window has room,
+    the remaining window spread over the calls left once it runs low, and the
+    fixed SLEEP_SEC when the host sent no rate-limit headers."""
+    rl = _RATE.get(urlsplit(url).netloc)
+    if not rl:
+        return SLEEP_SEC
+    remaining, reset = rl
+    if remaining > 5:
+        return 0.0
+    return max(0.0, reset - time.time()) / max(remaining, 1)
+
 # --------- Cursor parsing (common) ----------
 def find_bottom_cursor(data):
     """Find a 'Bottom' cursor in timeline/instructions."""
-    def recurse(obj):
-        if isinstance(obj, dict):
-            if obj.get("cursorType") == "Bottom" and "value" in obj:
-                return obj["value"]
-            for v in obj.values():
-                c = recurse(v)
-                if c: return c
-        elif isinstance(obj, list):
-            for it in obj:
-                c = recurse(it)
-                if c: return c
+    def walk(root):
+        # Depth-first in document order, with an explicit stack instead of recursion
+        stack = [root]
+        while stack:
+            obj = stack.pop()
+            t = type(obj)   # parsed JSON: exact dict/list, no subclasses to honor
+            if t is dict:
+                if obj.get("cursorType") == "Bottom" and obj.get("value"):
+                    return obj["value"]
+                stack.extend(reversed(obj.values()))
+            elif t is list:
+                stack.extend(reversed(obj))
         return None
 
-    # Try typical instruction shapes first
+    # Try typical instruction shapes first. The Bottom cursor is the last
+    # entry of a page, so scan instructions and entries back to front.
+    timeline = data.get("timeline")
     try:
-        timeline = data.get("timeline") or {}
-        instructions = timeline.get("instructions") or []
-        for ins in instructions:
+        for ins in reversed((timeline or {}).get("instructions") or []):
             entries = []
             if "addEntries" in ins and ins["addEntries"].get("entries"):
                 entries.extend(ins["addEntries"]["entries"])
             if "replaceEntry" in ins and "entry" in ins["replaceEntry"]:
                 entries.append(ins["replaceEntry"]["entry"])
-            for e in entries:
+            for e in reversed(entries):
                 content = e.get("content") or {}
                 cur = (((content.get("operation") or {}).get("cursor")) or {})
                 if cur and cur.get("cursorType") == "Bottom" and cur.get("value"):
@@ -202,7 +321,9 @@ def find_bottom_cursor(data):
     except Exception:
         pass
 
-    return recurse(data)
+    # Odd shapes: walk the timeline only. globalObjects (every tweet and user
+    # on the page, the bulk of the payload) never carries the cursor.
+    return walk(timeline if type(timeline) is dict else data)
 
 # --------- Extraction ----------
 def merge_objects(dst: dict, src: dict):
@@ -215,131 +336,158 @@ def extract_from_global_objects(data, agg_tweets, agg_users):
     merge_objects(agg_users,  g.get("users")  or {})
 
 # --------- Collectors ----------
-def collect_conversation(screen_name, root_id):
-    """Primary collector: /i/api/2/timeline/conversation/<id>.json"""
+def paginate(kind, tag, page_url, screen_name, root_id):
+    """Follow Bottom cursors page by page, merging each page's globalObjects.
+    The next page is already in flight on a worker thread while the current
+    one is merged and its debug copy written."""
     tweets, users = {}, {}
     cursor, pages = None, 0
-
-    while pages < MAX_PAGES:
-        pages += 1
-        params = {"count": 100, "tweet_mode": "extended"}
-        if cursor: params["cursor"] = cursor
-        url = CONVO_URL.format(tid=root_id) + "?" + urlencode(params)
-
-        log(f"[CONVO] Fetch page {pages} cursor={cursor!r}")
-        data, raw, err = fetch_json(url, headers(screen_name, root_id), tag="[CONVO]")
-        if raw is not None: save_debug_blob("convo", pages, raw)
-        if not data:
-            log(f"[CONVO] No data on page {pages}.")
-            break
-
-        extract_from_global_objects(data, tweets, users)
-
-        nxt = find_bottom_cursor(data)
-        log(f"[CONVO] Parsed Bottom cursor: {nxt!r}")
-        if not nxt or nxt == cursor:
-            log("[CONVO] No next cursor or same cursor — done.")
-            break
-        cursor = nxt
-        time.sleep(SLEEP_SEC)
-
-    log(f"[CONVO] pages={pages-1} tweets={len(tweets)} users={len(users)}")
+    hdrs = headers(screen_name, root_id)   # constant for the whole walk
+
+    def fetch(n, cur, pause):
+        url = page_url(cur)
+        if pause:
+            delay = page_delay(url)
+            if delay > SLEEP_SEC: log(f"{tag} Rate limit low; waiting {delay:.1f}s")
+            if delay: time.sleep(delay)
+        log(f"{tag} Fetch page {n} cursor={cur!r}")
+        return fetch_json(url, hdrs, tag=tag)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = None
+        if pages < MAX_PAGES:
+            pages += 1
+            pending = pool.submit(fetch, pages, cursor, False)
+        while pending:
+            data, raw, err = pending.result()
+            pending, page = None, pages
+            if not data:
+                if SAVE_JSON and raw is not None: save_debug_blob(kind, page, raw)
+                log(f"{tag} No data on page {page}.")
+                break
+
+            nxt = find_bottom_cursor(data)
+            log(f"{tag} Parsed Bottom cursor: {nxt!r}")
+            if not nxt or nxt == cursor:
+                log(f"{tag} No next cursor or same cursor — done.")
+            elif pages < MAX_PAGES:
+                cursor = nxt
+                pages += 1
+                pending = pool.submit(fetch, pages, cursor, True)
+
+            extract_from_global_objects(data, tweets, users)
+            if SAVE_JSON and raw is not None: save_debug_blob(kind, page, raw)
+
+    log(f"{tag} pages={pages-1} tweets={len(tweets)} users={len(users)}")
     return tweets, users
 
+def collect_conversation(screen_name, root_id):
+    """Primary collector: /i/api/2/timeline/conversation/<id>.json"""
+    base = CONVO_URL.format(tid=root_id) + "?" + urlencode({"count": 100, "tweet_mode": "extended"})
+    def page_url(cursor):
+        return base + "&cursor=" + quote_plus(cursor) if cursor else base
+    return paginate("convo", "[CONVO]", page_url, screen_name, root_id)
+
 def collect_search(screen_name, root_id):
     """Fallback collector: adaptive search over conversation_id:<root_id> (live)."""
-    tweets, users = {}, {}
-    cursor, pages = None, 0
-
-    while pages < MAX_PAGES:
-        pages += 1
-        params = {
-            "q": f"conversation_id:{root_id}",
-            "count": 100,
-            "tweet_search_mode": "live",
-            "query_source": "typed_query",
-            "tweet_mode": "extended",
-            "pc": "ContextualServices",
-            "spelling_corrections": "1",
-            "include_quote_count": "true",
-            "include_reply_count": "true",
-            "ext": "mediaStats,highlightedLabel,hashtags,antispam_media_platform,voiceInfo,superFollowMetadata,unmentionInfo,editControl,emoji_reaction"
-        }
-        if cursor: params["cursor"] = cursor
-        url = SEARCH_URL + "?" + urlencode(params)
-
-        log(f"[SEARCH] Fetch page {pages} cursor={cursor!r}")
-        data, raw, err = fetch_json(url, headers(screen_name, root_id), tag="[SEARCH]")
-        if raw is not None: save_debug_blob("search", pages, raw)
-        if not data:
-            log(f"[SEARCH] No data on page {pages}.")
-            break
-
-        extract_from_global_objects(data, tweets, users)
-
-        nxt = find_bottom_cursor(data)
-        log(f"[SEARCH] Parsed Bottom cursor: {nxt!r}")
-        if not nxt or nxt == cursor:
-            log("[SEARCH] No next cursor or same cursor — done.")
-            break
-        cursor = nxt
-        time.sleep(SLEEP_SEC)
-
-    log(f"[SEARCH] pages={pages-1} tweets={len(tweets)} users={len(users)}")
-    return tweets, users
+    base = SEARCH_URL + "?" + urlencode({
+        "q": f"conversation_id:{root_id}",
+        "count": 100,
+        "tweet_search_mode": "live",
+        "query_source": "typed_query",
+        "tweet_mode": "extended",
+        "pc": "ContextualServices",
+        "spelling_corrections": "1",
+        "include_quote_count": "true",
+        "include_reply_count": "true",
+        "ext": "mediaStats,highlightedLabel,hashtags,antispam_media_platform,voiceInfo,superFollowMetadata,unmentionInfo,editControl,emoji_reaction"
+    })
+    def page_url(cursor):
+        return base + "&cursor=" + quote_plus(cursor) if cursor else base
+    return paginate("search", "[SEARCH]", page_url, screen_name, root_id)
 
 # --------- Build outputs ----------
-def tstamp(tweet):
+NO_AVATAR = '<div class="ss3k-ravatar" style="width:32px;height:32px;border-radius:50%;background:#eee"></div>'
+REPLY_END = '</div></div></div>'
+
+def render_user(u):
+    """Static card markup around one author's replies: (head, mid).
+    A reply card is head + tweet id + mid + escaped text + REPLY_END."""
+    name = u.get("name") or "User"
+    handle = u.get("screen_name") or ""
+    avatar = (u.get("profile_image_url_https") or u.get("profile_image_url") or "").replace("_normal.","_bigger.")
+    imgtag = f'<img class="ss3k-ravatar" src="{html.escape(avatar)}" alt="">' if avatar else NO_AVATAR
+    who = html.escape(f"{name} (@{handle})") if handle else html.escape(name)
+    head = f'<div class="ss3k-reply"><a href="https://x.com/{handle}/status/'
+    mid = (f'" target="_blank" rel="noopener">{imgtag}</a>'
+           f'<div class="ss3k-rcontent"><div class="ss3k-rname">{who}</div>'
+           f'<div class="ss3k-rtext">')
+    return head, mid
+
+def render_reply(tid, t, users, user_cache):
+    uid = str(t.get("user_id_str") or t.get("user_id") or "")
+    card = user_cache.get(uid)
+    if card is None:
+        card = user_cache[uid] = render_user(users.get(uid, {}))
+    head, mid = card
+    text = html.escape(t.get("full_text") or t.get("text") or "")
+    return f"{head}{tid}{mid}{text}{REPLY_END}"
+
+def normalize_url(u):
+    """(domain, dedup key) for a shared link: host lowercased without www.,
+    tracking params and trailing slash dropped; the fragment is kept."""
     try:
-        import time as _t
-        return _t.mktime(_t.strptime(tweet.get("created_at",""), "%a %b %d %H:%M:%S %z %Y"))
-    except Exception:
-        return 0
+        parts = urlsplit(u)
+    except ValueError:
+        return "links", u
+    host = parts.netloc.lower()
+    if host.startswith("www."): host = host[4:]
+    if not host:
+        return "links", u
+    share = host in SHARE_HOSTS
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if k.lower() not in TRACKING_PARAMS
+                       and not (share and k.lower() in SHARE_PARAMS)])
+    path = parts.path.rstrip("/")
+    return host, urlunsplit((parts.scheme.lower(), host, path, query, parts.fragment))
+
+def add_urls_from(t, doms):
+    ent = t.get("entities") or {}
+    for u in (ent.get("urls") or []):
+        u2 = u.get("expanded_url") or u.get("url")
+        if not u2: continue
+        dom, key = normalize_url(u2)
+        doms[dom].setdefault(key, u2)   # first spelling seen is the one shown
 
 def build_outputs(replies, users):
-    # Replies HTML
-    blocks = []
-    for t in replies:
-        uid = str(t.get("user_id_str") or t.get("user_id") or "")
-        u = users.get(uid, {})
-        name = u.get("name") or "User"
-        handle = u.get("screen_name") or ""
-        avatar = (u.get("profile_image_url_https") or u.get("profile_image_url") or "").replace("_normal.","_bigger.")
-        url = f"https://x.com/{handle}/status/{t.get('id_str') or t.get('id')}"
-        text = html.escape(t.get("full_text") or t.get("text") or "")
-        imgtag = f'<img class="ss3k-ravatar" src="{html.escape(avatar)}" alt="">' if avatar else '<div class="ss3k-ravatar" style="width:32px;height:32px;border-radius:50%;background:#eee"></div>'
-        who = html.escape(f"{name} (@{handle})") if handle else html.escape(name)
-        blocks.append(
-            f'<div class="ss3k-reply"><a href="{url}" target="_blank" rel="noopener">{imgtag}</a>'
-            f'<div class="ss3k-rcontent"><div class="ss3k-rname">{who}</div>'
-            f'<div class="ss3k-rtext">{text}</div></div></div>'
-        )
-    open(OUT_REPLIES,"w", encoding="utf-8").write("\n".join(blocks))
-    log(f"Wrote replies HTML: {OUT_REPLIES} ({len(blocks)} items)")
-
-    # Links HTML grouped by domain
-    doms = defaultdict(set)
-    def add_urls_from(t):
-        ent = t.get("entities") or {}
-        for u in (ent.get("urls") or []):
-            u2 = u.get("expanded_url") or u.get("url")
-            if not u2: continue
-            m = re.search(r"https?://([^/]+)/?", u2)
-            dom = m.group(1) if m else "links"
-            doms[dom].add(u2)
-
-    for t in replies:
-        add_urls_from(t)
-
-    lines = []
-    for dom in sorted(doms):
-        lines.append(f"<h4>{html.escape(dom)}</h4>")
-        lines.append("<ul>")
-        for u in sorted(doms[dom]):
-            e = html.escape(u)
-            lines.append(f'<li><a href="{e}" target="_blank" rel="noopener">{e}</a></li>')
-        lines.append("</ul>")
-    open(OUT_LINKS,"w", encoding="utf-8").write("\n".join(lines))
+    # replies: (tweet id, tweet) pairs in display order.
+    # Replies HTML, streamed card by card through a large write buffer.
+    # One author usually posts several replies, so their markup is cached.
+    # Shared links are grouped by domain in the same pass over the replies.
+    user_cache = {}
+    doms = defaultdict(dict)
+    with open(OUT_REPLIES, "w", encoding="utf-8", buffering=1 << 20) as fh:
+        for i, (tid, t) in enumerate(replies):
+            if i: fh.write("\n")
+            fh.write(render_reply(tid, t, users, user_cache))
+            add_urls_from(t, doms)
+    log(f"Wrote replies HTML: {OUT_REPLIES} ({len(replies)} items)")
+
+    # Links HTML grouped by domain, written straight through like the replies.
+    # One sort over (domain, url) pairs orders both levels at once.
+    esc = html.escape
+    pairs = sorted((dom, u) for dom, seen in doms.items() for u in seen.values())
+    with open(OUT_LINKS, "w", encoding="utf-8", buffering=1 << 20) as fh:
+        w = fh.write
+        cur = None
+        for dom, u in pairs:
+            if dom != cur:
+                if cur is not None: w("\n</ul>\n")
+                w(f"<h4>{esc(dom)}</h4>\n<ul>")
+                cur = dom
+            e = esc(u)
+            w(f'\n<li><a href="{e}" target="_blank" rel="noopener">{e}</a></li>')
+        if cur is not None: w("\n</ul>")
     log(f"Wrote links HTML: {OUT_LINKS} (domains={len(doms)})")
 
 # --------- Main ----------
@@ -359,25 +507,18 @@ def main():
             log("Primary (conversation) returned no tweets; falling back to adaptive search.")
             tweets, users = collect_search(screen_name, root_id)
 
-        # Filter to the conversation thread only, exclude the root itself, skip pure RTs
-        replies = []
-        for tid, t in (tweets or {}).items():
-            conv = str(t.get("conversation_id_str") or t.get("conversation_id") or "")
-            if conv != str(root_id):
-                continue
-            if str(t.get("id_str") or t.get("id")) == str(root_id):
-                continue
-            if t.get("retweeted_status_id") or t.get("retweeted_status_id_str"):
-                continue
-            replies.append(t)
-
-        # De-duplicate and sort
-        uniq = {}
-        for t in replies:
-            tid = str(t.get("id_str") or t.get("id") or "")
-            if tid: uniq[tid] = t
-        replies = list(uniq.values())
-        replies.sort(key=tstamp)
+        # One pass: keep the conversation thread only, exclude the root itself,
+        # skip pure RTs. globalObjects is keyed by tweet id, so the merged
+        # dict holds no duplicates and its keys are the ids.
+        root = str(root_id)
+        replies = [
+            (tid, t) for tid, t in (tweets or {}).items()
+            if tid != root and tid.isdigit()
+            and str(t.get("conversation_id_str") or t.get("conversation_id") or "") == root
+            and not (t.get("retweeted_status_id") or t.get("retweeted_status_id_str"))
+        ]
+        # Snowflake ids grow with creation time: integer order is chronological
+        replies.sort(key=lambda p: int(p[0]))
 
         log(f"Total replies in conversation: {len(replies)}")
         build_outputs(replies, users)